@@ -1,52 +1,137 @@
 import tkinter as tk
 from tkinter import ttk
-import ast
+import functools
+import math
 import operator
+import re
+from typing import Callable
+
+_END_OPS = ("+", "-", "*", "/")
+_OP_MAP = {"÷": "/", "×": "*", "−": "-", "+": "+"}
+_OP_SET = frozenset("÷×−+")
+_ACTION_SET = frozenset("C⌫%±")
+# Running preview state: value == total + (term <pending_op> number)
+_FOLD_START = (0, 1, "*", "")
+# Groups: number, operator/parenthesis, anything else (rejected)
+_TOKEN_RE = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|(\*\*|[-+*/%()])|(\S))", re.ASCII)
 
 
 class SafeEvaluator:
-    ALLOWED_OPERATORS = {
-        ast.Add: operator.add,
-        ast.Sub: operator.sub,
-        ast.Mult: operator.mul,
-        ast.Div: operator.truediv,
-        ast.Pow: operator.pow,
-        ast.Mod: operator.mod,
-        ast.USub: operator.neg,
-        ast.UAdd: operator.pos,
+    BINARY_OPERATORS = {
+        "+": operator.add,
+        "-": operator.sub,
+        "*": operator.mul,
+        "/": operator.truediv,
+        "**": operator.pow,
+        "%": operator.mod,
+    }
+    UNARY_OPERATORS = {
+        "u-": operator.neg,
+        "u+": operator.pos,
     }
+    # Unary signs bind tighter than * and / but looser than **, as in Python
+    PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2, "%": 2, "u-": 3, "u+": 3, "**": 4}
+    RIGHT_ASSOCIATIVE = {"**", "u-", "u+"}
 
     @classmethod
     def evaluate(cls, expression: str) -> float:
-        node = ast.parse(expression, mode="eval").body
-        return cls._eval_node(node)
+        return cls.compile(expression)()
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        cls.compile.cache_clear()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def compile(expression: str) -> Callable[[], float]:
+        # The preview re-evaluates every prefix as the user types, so keep
+        # recently compiled expressions around instead of re-parsing them.
+        return SafeEvaluator._compile_rpn(SafeEvaluator._to_rpn(expression))
 
     @classmethod
-    def _eval_node(cls, node):
-        if isinstance(node, ast.Num):  # Python <3.8
-            return node.n
-        if isinstance(node, ast.Constant):  # Python 3.8+
-            if isinstance(node.value, (int, float)):
-                return node.value
-            raise ValueError("Invalid constant")
-        if isinstance(node, ast.BinOp):
-            left = cls._eval_node(node.left)
-            right = cls._eval_node(node.right)
-            op_type = type(node.op)
-            if op_type not in cls.ALLOWED_OPERATORS:
-                raise ValueError("Operator not allowed")
-            func = cls.ALLOWED_OPERATORS[op_type]
-            return func(left, right)
-        if isinstance(node, ast.UnaryOp):
-            operand = cls._eval_node(node.operand)
-            op_type = type(node.op)
-            if op_type not in cls.ALLOWED_OPERATORS:
-                raise ValueError("Unary operator not allowed")
-            func = cls.ALLOWED_OPERATORS[op_type]
-            return func(operand)
-        if isinstance(node, ast.Expr):
-            return cls._eval_node(node.value)
-        raise ValueError("Invalid expression")
+    def _to_rpn(cls, expression: str) -> tuple:
+        output = []
+        ops = []
+        expect_operand = True
+        for match in _TOKEN_RE.finditer(expression):
+            number, op, invalid = match.groups()
+            if invalid is not None:
+                raise ValueError("Invalid character")
+            if number is not None:
+                if not expect_operand:
+                    raise ValueError("Invalid expression")
+                output.append(float(number) if "." in number else int(number))
+                expect_operand = False
+            elif op == "(":
+                if not expect_operand:
+                    raise ValueError("Invalid expression")
+                ops.append(op)
+            elif op == ")":
+                if expect_operand:
+                    raise ValueError("Invalid expression")
+                while ops and ops[-1] != "(":
+                    output.append(ops.pop())
+                if not ops:
+                    raise ValueError("Unbalanced parentheses")
+                ops.pop()
+            elif expect_operand:
+                if op not in ("+", "-"):
+                    raise ValueError("Operator not allowed")
+                ops.append("u" + op)
+            else:
+                prec = cls.PRECEDENCE[op]
+                while ops and ops[-1] != "(" and (
+                    cls.PRECEDENCE[ops[-1]] > prec
+                    or (cls.PRECEDENCE[ops[-1]] == prec and op not in cls.RIGHT_ASSOCIATIVE)
+                ):
+                    output.append(ops.pop())
+                ops.append(op)
+                expect_operand = True
+        if expect_operand:
+            raise ValueError("Incomplete expression")
+        while ops:
+            op = ops.pop()
+            if op == "(":
+                raise ValueError("Unbalanced parentheses")
+            output.append(op)
+        return tuple(output)
+
+    @classmethod
+    def _compile_rpn(cls, rpn: tuple) -> Callable[[], float]:
+        # RPN is already post-order, so a single pass over it builds the
+        # closure tree bottom-up on a stack of thunks.
+        stack = []
+        handlers = cls._HANDLERS
+        for token in rpn:
+            try:
+                handler = handlers[type(token)]
+            except KeyError:
+                raise ValueError("Invalid expression") from None
+            handler(stack, token)
+        return stack[0]
+
+    @staticmethod
+    def _push_number(stack: list, value) -> None:
+        stack.append(lambda v=value: v)
+
+    @classmethod
+    def _apply_operator(cls, stack: list, op: str) -> None:
+        unary = cls.UNARY_OPERATORS.get(op)
+        if unary is not None:
+            operand = stack.pop()
+            stack.append(lambda f=unary, x=operand: f(x()))
+            return
+        right = stack.pop()
+        left = stack.pop()
+        func = cls.BINARY_OPERATORS[op]
+        stack.append(lambda f=func, l=left, r=right: f(l(), r()))
+
+
+SafeEvaluator._HANDLERS = {
+    int: SafeEvaluator._push_number,
+    float: SafeEvaluator._push_number,
+    str: SafeEvaluator._apply_operator,
+}
 
 
 class CalculatorApp(tk.Tk):
@@ -59,6 +144,17 @@ class CalculatorApp(tk.Tk):
 
         self.expression_var = tk.StringVar(value="")
         self.result_var = tk.StringVar(value="0")
+        # Last value written to each variable, keyed by its Tcl name
+        self._var_values = {str(self.expression_var): "", str(self.result_var): "0"}
+        self._preview_pending = None
+        self._fold_state = _FOLD_START
+        self._dispatch = {
+            "C": self._clear,
+            "⌫": self._backspace,
+            "±": self._toggle_sign,
+            "%": self._percent,
+            "=": self._equals,
+        }
 
         self._build_styles()
         self._build_layout()
@@ -86,67 +182,52 @@ class CalculatorApp(tk.Tk):
         self.color_btn = "#1e1e2e"
         self.color_btn_hover = "#2a2a3a"
 
-        # Display style
-        self.style.configure(
-            "Display.TEntry",
-            fieldbackground=self.color_display,
-            foreground=self.color_text,
-            bordercolor=self.color_display,
-            lightcolor=self.color_display,
-            darkcolor=self.color_display,
-            borderwidth=0,
-            padding=8,
-            relief="flat",
-        )
-        
-        # Button styles to prevent OS override
-        self.style.configure(
-            "Digit.TButton",
-            background="#ffffff",
-            foreground="#000000",
-            borderwidth=0,
-            focuscolor="none",
-            padding=(10, 10),
-        )
-        self.style.map("Digit.TButton",
-            background=[("active", "#f0f0f0"), ("pressed", "#ffffff")]
-        )
-        
-        self.style.configure(
-            "Op.TButton",
-            background="#06b6d4",
-            foreground="#ffffff",
-            borderwidth=0,
-            focuscolor="none",
-            padding=(10, 10),
-        )
-        self.style.map("Op.TButton",
-            background=[("active", "#0891b2"), ("pressed", "#06b6d4")]
-        )
-        
-        self.style.configure(
-            "Action.TButton",
-            background="#06b6d4",
-            foreground="#ffffff",
-            borderwidth=0,
-            focuscolor="none",
-            padding=(10, 10),
-        )
-        self.style.map("Action.TButton",
-            background=[("active", "#0891b2"), ("pressed", "#06b6d4")]
+        button_base = {"borderwidth": 0, "focuscolor": "none", "padding": (10, 10)}
+        accent_button = (
+            dict(button_base, background="#06b6d4", foreground="#ffffff"),
+            {"background": [("active", "#0891b2"), ("pressed", "#06b6d4")]},
         )
+        styles = [
+            ("Panel.TFrame", {"background": self.color_bg}, None),
+            ("Accent.TSeparator", {"background": "#0a1220"}, None),
+            (
+                "Display.TEntry",
+                {
+                    "fieldbackground": self.color_display,
+                    "foreground": self.color_text,
+                    "bordercolor": self.color_display,
+                    "lightcolor": self.color_display,
+                    "darkcolor": self.color_display,
+                    "borderwidth": 0,
+                    "padding": 8,
+                    "relief": "flat",
+                },
+                None,
+            ),
+            # Button styles to prevent OS override
+            (
+                "Digit.TButton",
+                dict(button_base, background="#ffffff", foreground="#000000"),
+                {"background": [("active", "#f0f0f0"), ("pressed", "#ffffff")]},
+            ),
+            ("Op.TButton", *accent_button),
+            ("Action.TButton", *accent_button),
+        ]
+        # One configure/map per style keeps the Tcl round-trips to a minimum
+        for name, cfg, mapping in styles:
+            self.style.configure(name, **cfg)
+            if mapping:
+                self.style.map(name, **mapping)
 
     def _build_layout(self) -> None:
         container = ttk.Frame(self, padding=18)
         container.pack(fill="both", expand=True)
         container.configure(style="Panel.TFrame")
-        self.style.configure("Panel.TFrame", background=self.color_bg)
 
         # Header
         header_frame = tk.Frame(container, bg=self.color_bg)
         header_frame.pack(fill="x")
-        accent = tk.Frame(header_frame, bg="#0a1220", height=4)
-        accent.pack(fill="x", side="top", pady=(0, 10))
+        ttk.Separator(header_frame, style="Accent.TSeparator").pack(fill="x", side="top", pady=(0, 10))
         title = tk.Label(
             header_frame,
             text="Oscar's Pro Calculator",
@@ -158,12 +239,14 @@ class CalculatorApp(tk.Tk):
         title.pack(fill="x", pady=(2, 8))
 
         # Display panel
-        card_outer = tk.Frame(container, bg=self.color_bg)
-        card_outer.pack(fill="x")
-        card_shadow = tk.Frame(card_outer, bg="#0a1220")
-        card_shadow.pack(fill="x", padx=2, pady=(0, 14))
-        display_frame = tk.Frame(card_shadow, bg=self.color_panel)
-        display_frame.pack(fill="x", padx=2, pady=2)
+        display_frame = tk.Frame(
+            container,
+            bg=self.color_panel,
+            highlightthickness=2,
+            highlightbackground="#0a1220",
+            highlightcolor="#0a1220",
+        )
+        display_frame.pack(fill="x", padx=2, pady=(0, 14))
 
         expression_label = tk.Label(
             display_frame,
@@ -211,11 +294,15 @@ class CalculatorApp(tk.Tk):
                 kind = self._button_kind(label)
                 # Use ttk.Button with custom styles
                 style_name = self._get_button_style(kind)
+                if label in self._dispatch:
+                    command = self._dispatch[label]
+                else:
+                    command = functools.partial(self._on_press, label)
                 btn = ttk.Button(
                     grid_frame,
                     text=label,
                     style=style_name,
-                    command=lambda l=label: self._on_press(l)
+                    command=command,
                 )
                 btn.grid(row=r, column=c, columnspan=span, padx=7, pady=7, sticky="nsew")
 
@@ -243,11 +330,11 @@ class CalculatorApp(tk.Tk):
         return "Digit.TButton"
 
     def _button_kind(self, label: str) -> str:
-        if label in {"=",}:
+        if label == "=":
             return "equals"
-        if label in {"÷", "×", "−", "+"}:
+        if label in _OP_SET:
             return "op"
-        if label in {"C", "⌫", "%", "±"}:
+        if label in _ACTION_SET:
             return "action"
         return "digit"
 
@@ -263,46 +350,41 @@ class CalculatorApp(tk.Tk):
         if char.isdigit() or char == ".":
             self._append_char(char)
             return
-        if char in "+-*/":
+        if char in _END_OPS:
             self._append_operator(char)
             return
 
     def _on_press(self, label: str) -> None:
-        if label == "C":
-            self._clear()
-        elif label == "⌫":
-            self._backspace()
-        elif label == "±":
-            self._toggle_sign()
-        elif label == "%":
-            self._percent()
-        elif label == "=":
-            self._equals()
-        elif label in {"÷", "×", "−", "+"}:
-            mapped = {"÷": "/", "×": "*", "−": "-", "+": "+"}[label]
-            self._append_operator(mapped)
+        # Action buttons are bound straight to their handlers via _dispatch
+        if label in _OP_SET:
+            self._append_operator(_OP_MAP[label])
         else:
             self._append_char(label)
 
     def _clear(self) -> None:
-        self.expression_var.set("")
-        self.result_var.set("0")
+        self._set_var(self.expression_var, "")
+        self._set_var(self.result_var, "0")
+        self._fold_state = _FOLD_START
+        SafeEvaluator.clear_cache()
 
     def _backspace(self) -> None:
         current = self.expression_var.get()
         if current:
-            self.expression_var.set(current[:-1])
-        self._reflect_expression_to_result_preview()
+            self._set_var(self.expression_var, current[:-1])
+            self._fold_state = self._fold_expression(current[:-1])
+        self._schedule_preview()
+
+    def _last_operator_index(self, expr: str) -> int:
+        # Index of the operator before the number being typed, -1 if none
+        return max(expr.rfind(c) for c in _END_OPS)
 
     def _toggle_sign(self) -> None:
         expr = self.expression_var.get()
         if not expr:
             return
-        i = len(expr) - 1
-        while i >= 0 and (expr[i].isdigit() or expr[i] == "."):
-            i -= 1
-        number = expr[i + 1 :]
-        prefix = expr[: i + 1]
+        split = self._last_operator_index(expr)
+        number = expr[split + 1 :]
+        prefix = expr[: split + 1]
         if not number:
             return
         if number.startswith("-"):
@@ -310,51 +392,126 @@ class CalculatorApp(tk.Tk):
         else:
             number = "-" + number
         new_expr = prefix + number
-        self.expression_var.set(new_expr)
-        self._reflect_expression_to_result_preview()
+        self._set_var(self.expression_var, new_expr)
+        self._fold_state = self._fold_expression(new_expr)
+        self._schedule_preview()
 
     def _percent(self) -> None:
         expr = self.expression_var.get()
         if not expr:
             return
-        i = len(expr) - 1
-        while i >= 0 and (expr[i].isdigit() or expr[i] == "." or (expr[i] == "-" and (i == 0 or not expr[i-1].isdigit()))):
-            i -= 1
-        number = expr[i + 1 :]
-        prefix = expr[: i + 1]
+        split = self._last_operator_index(expr)
+        # A minus with no digit before it is the number's own sign
+        if split >= 0 and expr[split] == "-" and (split == 0 or not expr[split - 1].isdigit()):
+            split -= 1
+        number = expr[split + 1 :]
+        prefix = expr[: split + 1]
         try:
             value = float(number)
             value /= 100.0
             number_str = ("%f" % value).rstrip("0").rstrip(".")
-            self.expression_var.set(prefix + number_str)
-            self._reflect_expression_to_result_preview()
+            self._set_var(self.expression_var, prefix + number_str)
+            self._fold_state = self._fold_expression(prefix + number_str)
+            self._schedule_preview()
         except Exception:
             pass
 
     def _append_char(self, char: str) -> None:
         expr = self.expression_var.get()
         if char == ".":
-            i = len(expr) - 1
-            while i >= 0 and (expr[i].isdigit() or expr[i] == "."):
-                if expr[i] == ".":
-                    return
-                i -= 1
-        self.expression_var.set(expr + char)
-        self._reflect_expression_to_result_preview()
+            split = self._last_operator_index(expr)
+            if "." in expr[split + 1 :]:
+                return
+        self._set_var(self.expression_var, expr + char)
+        if self._fold_state is not None:
+            total, term, pending, number = self._fold_state
+            self._fold_state = (total, term, pending, number + char)
+        self._schedule_preview()
 
     def _append_operator(self, op: str) -> None:
         expr = self.expression_var.get()
         if not expr and op in "+-*/":
             if op in "+*/":
                 return
-        if expr.endswith(tuple("+-*/")):
-            expr = expr[:-1]
-        self.expression_var.set(expr + op)
-        self._reflect_expression_to_result_preview()
+        if expr.endswith(_END_OPS):
+            # Replacing an operator is rare; just refold from scratch
+            self._set_var(self.expression_var, expr[:-1] + op)
+            self._fold_state = self._fold_expression(expr[:-1] + op)
+        else:
+            self._set_var(self.expression_var, expr + op)
+            self._fold_state = self._fold_step(self._fold_state, op)
+        self._schedule_preview()
+
+    def _fold_step(self, state, op: str):
+        # None means the state can't be tracked incrementally any more and
+        # the preview falls back to SafeEvaluator.
+        if state is None:
+            return None
+        total, term, pending, number = state
+        if not number:
+            # An operator with no number before it is a sign
+            if op == "-":
+                return (total, -term, pending, number)
+            if op == "+":
+                return state
+            return None
+        try:
+            term = SafeEvaluator.BINARY_OPERATORS[pending](term, self._fold_number(number))
+        except (ValueError, ArithmeticError):
+            return None
+        if op in ("*", "/"):
+            return (total, term, op, "")
+        return (total + term, -1 if op == "-" else 1, "*", "")
+
+    def _fold_expression(self, expr: str):
+        state = _FOLD_START
+        for char in expr:
+            if char in _END_OPS:
+                state = self._fold_step(state, char)
+            elif char.isdigit() or char == ".":
+                total, term, pending, number = state
+                state = (total, term, pending, number + char)
+            else:
+                return None
+            if state is None:
+                return None
+        return state
+
+    def _fold_value(self, state) -> float:
+        total, term, pending, number = state
+        return total + SafeEvaluator.BINARY_OPERATORS[pending](term, self._fold_number(number))
+
+    def _fold_number(self, number: str):
+        # int()/float() accept any Unicode digit; match SafeEvaluator instead
+        if not number.isascii():
+            raise ValueError("Invalid number")
+        return float(number) if "." in number else int(number)
+
+    def _set_var(self, var: tk.StringVar, value: str) -> None:
+        # Skip no-op writes so Tk doesn't fire traces and redraw for nothing.
+        # Compare against the cached value so the check itself stays out of Tcl.
+        name = str(var)
+        if self._var_values.get(name) != value:
+            self._var_values[name] = value
+            var.set(value)
 
     def _sanitize_for_eval(self, expr: str) -> str:
         return expr
 
+    def _format_result(self, result: float) -> str:
+        if isinstance(result, int):
+            return str(result)
+        if not math.isfinite(result):
+            raise OverflowError("Result out of range")
+        if result.is_integer():
+            return str(int(result))
+        text = format(result, ".12g")
+        # Too large or small for 12 significant digits: fall back to the
+        # shortest exact repr rather than dropping the fraction
+        if "." not in text or "e" in text:
+            return repr(result)
+        return text
+
     def _equals(self) -> None:
         expr = self.expression_var.get()
         if not expr:
@@ -362,26 +519,34 @@ class CalculatorApp(tk.Tk):
         try:
             sanitized = self._sanitize_for_eval(expr)
             result = SafeEvaluator.evaluate(sanitized)
-            if int(result) == result:
-                pretty = str(int(result))
-            else:
-                pretty = ("%f" % result).rstrip("0").rstrip(".")
-            self.result_var.set(pretty)
+            self._set_var(self.result_var, self._format_result(result))
         except Exception:
-            self.result_var.set("Error")
+            self._set_var(self.result_var, "Error")
+
+    def _schedule_preview(self) -> None:
+        # Coalesce bursts of input (fast typing, key auto-repeat) into a
+        # single preview once the event loop goes idle.
+        if self._preview_pending is None:
+            self._preview_pending = self.after_idle(self._do_preview)
+
+    def _do_preview(self) -> None:
+        self._preview_pending = None
+        self._reflect_expression_to_result_preview()
 
     def _reflect_expression_to_result_preview(self) -> None:
         expr = self.expression_var.get()
         if not expr:
-            self.result_var.set("0")
+            self._set_var(self.result_var, "0")
+            return
+        # Incomplete expressions can't evaluate; keep the last preview
+        if expr[-1] in _END_OPS:
             return
         try:
-            result = SafeEvaluator.evaluate(self._sanitize_for_eval(expr))
-            if int(result) == result:
-                pretty = str(int(result))
+            if self._fold_state is not None:
+                result = self._fold_value(self._fold_state)
             else:
-                pretty = ("%f" % result).rstrip("0").rstrip(".")
-            self.result_var.set(pretty)
+                result = SafeEvaluator.evaluate(self._sanitize_for_eval(expr))
+            self._set_var(self.result_var, self._format_result(result))
         except Exception:
             pass
 